@@ -0,0 +1,35 @@
+"""
+Atomic file output for the build scripts.
+
+Artifacts are written to a temporary file next to the destination and moved
+into place with os.replace, so readers (the map, later build stages) never
+see a half-written file and a failed stage leaves the previous artifact intact.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_path(path):
+    """Yield a temporary path; on success it replaces `path`, on error it is removed"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=path.suffix, dir=path.parent)
+    os.close(fd)
+    os.remove(tmp_name)  # some writers (GDAL drivers) refuse to overwrite an existing file
+    try:
+        yield tmp_name
+        os.replace(tmp_name, path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+def write_bytes_atomic(path, data):
+    """Write bytes to `path` atomically"""
+    with atomic_path(path) as tmp_name:
+        with open(tmp_name, 'wb') as f:
+            f.write(data)
@@ -0,0 +1,76 @@
+"""
+Memory benchmark: compact county results vs. per-county dicts.
+
+Runs the full build over every election CSV in Data/, then measures the
+in-memory size of the compact store (interned strings + __slots__ records)
+and of the same results materialized as the public per-county dicts.
+Strings shared between objects are counted once in both cases, which makes
+the dict figure conservative (the old pipeline also held a second,
+intermediate dict per county before restructuring).
+
+Usage (from the repo root):
+    python scripts/benchmark_compact_results.py
+"""
+
+import sys
+import time
+
+from compact_results import StringTables
+from create_county_election_json import (
+    build_results_by_year, filter_contested_races, find_election_csv_files,
+    load_location_lookup, restructure_to_new_format
+)
+
+
+def deep_sizeof(obj, seen=None):
+    """Total size of an object graph in bytes, counting each object once"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    elif hasattr(obj, '__slots__'):
+        for slot in obj.__slots__:
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def main():
+    location_to_county = load_location_lookup()
+    all_csv_files = find_election_csv_files()
+
+    start = time.perf_counter()
+    strings = StringTables()
+    results_by_year = build_results_by_year(all_csv_files, location_to_county, strings)
+    results_by_year = filter_contested_races(results_by_year, strings)
+    build_seconds = time.perf_counter() - start
+
+    records = sum(
+        len(contest.results)
+        for categories in results_by_year.values()
+        for contests in categories.values()
+        for contest in contests.values()
+    )
+
+    compact_bytes = deep_sizeof((results_by_year, strings))
+    dict_bytes = deep_sizeof(restructure_to_new_format(results_by_year, strings))
+
+    print("\nCompact results memory benchmark")
+    print(f"  Build time:          {build_seconds:.1f}s")
+    print(f"  County records:      {records:,}")
+    print(f"  Interned strings:    {len(strings.counties)} counties, {len(strings.candidates)} candidates, {len(strings.contests)} contests")
+    print(f"  Per-county dicts:    {dict_bytes:>12,} bytes ({dict_bytes / records:,.0f} per record)")
+    print(f"  Compact records:     {compact_bytes:>12,} bytes ({compact_bytes / records:,.0f} per record)")
+    print(f"  Reduction:           {dict_bytes / compact_bytes:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Build every data product in dependency order.
+
+Each stage runs one of the scripts in scripts/ and declares the files it reads
+and writes. A stage is skipped when its outputs exist and none of its inputs,
+outputs or its script changed since it last ran (size + mtime, recorded in
+Data/.build_state.json). Independent stages (county geometry vs. election
+results) run in parallel, and every stage writes its artifacts atomically.
+
+Usage (from anywhere):
+    python scripts/build_all.py                    # build everything that is stale
+    python scripts/build_all.py election_results   # one stage and what it depends on
+    python scripts/build_all.py --force            # rebuild everything
+    python scripts/build_all.py --list             # show stages and whether they are fresh
+    python scripts/build_all.py download_2022_counties election_results   # refresh the 2022 CSVs first
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from atomic_write import write_bytes_atomic
+
+ROOT = Path(__file__).resolve().parent.parent
+STATE_PATH = ROOT / 'Data' / '.build_state.json'
+
+SHAPEFILE = ['Data/tl_2020_05_county20/tl_2020_05_county20.*', 'scripts/county_features.py']
+
+# Election CSVs only: statewide files in Data/ and the per-county files under Data/<year>/.
+# Kept explicit so other stages' outputs (county_lookup.csv, precinct_district_index.csv,
+# Data/published/) never count as inputs.
+ELECTION_CSVS = ['Data/*__ar__general*.csv', 'Data/20*_General_*.csv', 'Data/[0-9][0-9][0-9][0-9]/**/*.csv']
+
+
+class Stage:
+    """One build step: a script with declared inputs, outputs and upstream stages"""
+
+    def __init__(self, name, script, inputs, outputs, after=(), optional=False, explicit=False):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+        # Optional stages (network downloads) may fail without blocking downstream stages,
+        # which then build from whatever is already on disk
+        self.optional = optional
+        # Explicit stages (network downloads that overwrite committed data) only run when named
+        # as a target; they are never pulled in as a default or upstream stage
+        self.explicit = explicit
+
+
+STAGES = [
+    Stage(
+        'download_2022_counties', 'scripts/download_2022_counties.py',
+        inputs=['scripts/atomic_write.py'],
+        outputs=['Data/2022/counties/*.csv'],
+        optional=True,
+        explicit=True
+    ),
+    Stage(
+        'county_lookup', 'scripts/build_county_lookup.py',
+        inputs=['Data/2022_General_Federal.csv', 'Data/2020/counties/*.csv', 'scripts/atomic_write.py'] + SHAPEFILE,
+        outputs=['Data/county_lookup.csv']
+    ),
+    Stage(
+        'election_results', 'scripts/create_county_election_json.py',
+        inputs=ELECTION_CSVS + [
+            'Data/county_lookup.csv', 'scripts/compact_results.py', 'scripts/results_delta.py', 'scripts/atomic_write.py'
+        ] + SHAPEFILE,
+        outputs=['Data/arkansas_county_election_results.json', 'Data/arkansas_county_election_results.hashes.json'],
+        after=['download_2022_counties', 'county_lookup']
+    ),
+    Stage(
+        'district_results', 'scripts/create_district_election_json.py',
+        inputs=ELECTION_CSVS + ['scripts/create_county_election_json.py', 'scripts/atomic_write.py'],
+        outputs=['Data/arkansas_district_election_results.json', 'Data/precinct_district_index.csv'],
+        after=['download_2022_counties']
+    ),
+    Stage(
+        'county_geojson', 'scripts/convert_shapefile_to_geojson.py',
+        inputs=['scripts/atomic_write.py'] + SHAPEFILE,
+        outputs=['Data/tl_2020_05_county20.geojson']
+    ),
+    Stage(
+        'publish', 'scripts/publish_artifacts.py',
+        inputs=[
+            'Data/tl_2020_05_county20.geojson', 'Data/arkansas_county_election_results.json',
+            'Data/arkansas_district_election_results.json', 'Data/county_lookup.csv',
+            'Data/arkansas_county_election_results.delta.json',
+            'scripts/results_delta.py', 'scripts/atomic_write.py'
+        ],
+        outputs=['Data/published/manifest.json'],
+        after=['election_results', 'district_results', 'county_geojson']
+    ),
+]
+
+
+def expand(patterns):
+    """Resolve glob patterns (relative to the repo root) to a sorted list of files"""
+    files = set()
+    for pattern in patterns:
+        if any(ch in pattern for ch in '*?['):
+            files.update(p for p in ROOT.glob(pattern) if p.is_file())
+        elif (ROOT / pattern).is_file():
+            files.add(ROOT / pattern)
+    return sorted(files)
+
+
+def stage_signature(stage):
+    """Fingerprint of a stage's script, inputs and outputs (paths, sizes, mtimes)"""
+    digest = hashlib.sha1()
+    for path in expand([stage.script] + stage.inputs + stage.outputs):
+        st = path.stat()
+        digest.update(f"{path.relative_to(ROOT).as_posix()}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def outputs_exist(stage):
+    return all(expand([pattern]) for pattern in stage.outputs)
+
+
+def is_fresh(stage, state):
+    return outputs_exist(stage) and state.get(stage.name) == stage_signature(stage)
+
+
+def load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state):
+    write_bytes_atomic(STATE_PATH, json.dumps(state, indent=2, sort_keys=True).encode())
+
+
+def select_stages(targets):
+    """The requested stages plus everything upstream of them, in declaration order
+
+    With no targets, every stage except the explicit ones is built. Explicit stages
+    are only selected when they are themselves named.
+    """
+    by_name = {stage.name: stage for stage in STAGES}
+    unknown = [name for name in targets if name not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)} (choose from {', '.join(by_name)})")
+
+    wanted = set()
+    pending = list(targets or [stage.name for stage in STAGES if not stage.explicit])
+    while pending:
+        name = pending.pop()
+        if name in wanted or (by_name[name].explicit and name not in targets):
+            continue
+        wanted.add(name)
+        pending.extend(by_name[name].after)
+    return [stage for stage in STAGES if stage.name in wanted]
+
+
+def run_stage(stage, verbose):
+    """Run a stage's script from the repo root; returns (ok, seconds, output)"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(ROOT / stage.script)],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+    )
+    output = proc.stdout + proc.stderr
+    if verbose:
+        print(output)
+    return proc.returncode == 0, time.perf_counter() - start, output
+
+
+def build(targets=(), force=False, jobs=4, verbose=False):
+    """Build the selected stages; returns True when every required stage succeeded"""
+    stages = select_stages(targets)
+    names = {stage.name for stage in stages}
+    state = load_state()
+    done, failed = set(), set()
+    running = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(done) + len(failed) < len(stages):
+            for stage in stages:
+                if stage.name in done or stage.name in failed or stage.name in running.values():
+                    continue
+                upstream = [name for name in stage.after if name in names]
+                if any(name in failed for name in upstream):
+                    print(f"[SKIP] {stage.name} - upstream stage failed")
+                    failed.add(stage.name)
+                    continue
+                if not all(name in done for name in upstream):
+                    continue
+                if not force and is_fresh(stage, state):
+                    print(f"[FRESH] {stage.name}")
+                    done.add(stage.name)
+                    continue
+                print(f"[RUN] {stage.name} ({stage.script})")
+                running[pool.submit(run_stage, stage, verbose)] = stage.name
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                stage = next(s for s in stages if s.name == name)
+                ok, seconds, output = future.result()
+                if ok:
+                    print(f"  ✓ {stage.name} ({seconds:.1f}s)")
+                    state[stage.name] = stage_signature(stage)
+                    save_state(state)
+                    done.add(stage.name)
+                elif stage.optional:
+                    print(f"  [WARN] {stage.name} failed ({seconds:.1f}s); continuing with files on disk")
+                    done.add(stage.name)
+                else:
+                    print(f"  [ERROR] {stage.name} failed ({seconds:.1f}s):")
+                    print('    ' + '\n    '.join(output.strip().splitlines()[-15:]))
+                    failed.add(stage.name)
+
+    print(f"\nBuild {'failed' if failed else 'finished'} in {time.perf_counter() - start:.2f}s")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('targets', nargs='*', help='stages to build (default: all but explicit stages)')
+    parser.add_argument('--force', action='store_true', help='rebuild even if outputs are fresh')
+    parser.add_argument('--jobs', '-j', type=int, default=4, help='stages to run in parallel (default: 4)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='print each stage\'s output')
+    parser.add_argument('--list', action='store_true', help='list stages and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        state = load_state()
+        for stage in STAGES:
+            status = 'fresh' if is_fresh(stage, state) else 'stale'
+            after = f" (after {', '.join(stage.after)})" if stage.after else ''
+            explicit = ' [explicit]' if stage.explicit else ''
+            print(f"  {stage.name:<24} {status:<6} {stage.script}{after}{explicit}")
+        return
+
+    sys.exit(0 if build(args.targets, args.force, args.jobs, args.verbose) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,9 @@ Build correct county_lookup.csv by matching vote patterns between
 import pandas as pd
 from pathlib import Path
 
+from atomic_write import atomic_path
+from county_features import county_key, load_county_features
+
 # Read 2022 Federal data (has Location IDs)
 df_2022 = pd.read_csv('Data/2022_General_Federal.csv')
 pres_2022 = df_2022[df_2022['Contest Name'] == 'U.S. Senate'].copy()
@@ -29,9 +32,9 @@ for csv_file in precinct_dir.glob('*.csv'):
         except Exception as e:
             print(f"Error reading {csv_file.name}: {e}")
 
-# Get FIPS codes from current (wrong) lookup - FIPS codes are probably correct even if mapping isn't
-current_lookup = pd.read_csv('Data/county_lookup.csv')
-county_fips = dict(zip(current_lookup['County Name'], current_lookup['FIPS Code']))
+# Get FIPS codes from the county shapefile (GEOID20), so this script does not read its own output
+county_features = load_county_features()
+county_fips = {county_key(name): int(geoid) for geoid, name in zip(county_features['GEOID20'], county_features['NAME20'])}
 
 # Strategy: Match counties to Location IDs based on relative vote ranking
 # Sort both by total votes
@@ -50,7 +53,7 @@ for rank, ((county, votes_2020), (loc_id, votes_2022)) in enumerate(zip(sorted_c
         print(f"{rank:<6} {county:<20} {votes_2020:<12,} {loc_id:<12} {votes_2022:<12,} {ratio:<8.3f}")
     
     # Get FIPS code
-    fips = county_fips.get(county, f"05{rank:03d}")  # Fallback if not found
+    fips = county_fips.get(county_key(county), f"05{rank:03d}")  # Fallback if not found
     
     mapping.append({
         'Location ID': loc_id,
@@ -73,8 +76,9 @@ if len(polk_row) > 0:
     polk_id = polk_row['Location ID'].values[0]
     print(f"Polk County = Location ID {polk_id} (old wrong mapping said 56)")
 
-# Save
-output_path = 'Data/county_lookup_NEW.csv'
-df_mapping.to_csv(output_path, index=False)
+# Save (atomically - create_county_election_json.py reads this file)
+output_path = 'Data/county_lookup.csv'
+with atomic_path(output_path) as tmp_path:
+    df_mapping.to_csv(tmp_path, index=False)
 print(f"\n✓ Saved new mapping to {output_path}")
 print(f"Total counties mapped: {len(df_mapping)}")
@@ -0,0 +1,77 @@
+"""
+Compact in-memory model for county election results.
+
+The build keeps one CountyResult per (county, contest) across every year, so
+instead of a dict with a dozen keys per county it uses __slots__ records that
+hold interned string IDs, integer vote columns and an integer category code.
+Records are converted to the public JSON shape only when the output is written
+(see restructure_to_new_format in create_county_election_json.py).
+"""
+
+NO_STRING = -1
+
+
+class StringTable:
+    """Interns strings to small integer IDs (None -> NO_STRING)"""
+
+    __slots__ = ('ids', 'values')
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def intern(self, value):
+        if value is None:
+            return NO_STRING
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.values)
+            self.ids[value] = string_id
+            self.values.append(value)
+        return string_id
+
+    def lookup(self, string_id):
+        if string_id == NO_STRING:
+            return None
+        return self.values[string_id]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class StringTables:
+    """The interned string tables shared by one build"""
+
+    __slots__ = ('counties', 'candidates', 'contests')
+
+    def __init__(self):
+        self.counties = StringTable()
+        self.candidates = StringTable()
+        self.contests = StringTable()
+
+
+class CountyResult:
+    """Vote totals for one county in one contest"""
+
+    __slots__ = ('county_id', 'dem_candidate_id', 'rep_candidate_id',
+                 'dem_votes', 'rep_votes', 'other_votes', 'total_votes', 'category_code')
+
+    def __init__(self, county_id, total_votes=0):
+        self.county_id = county_id
+        self.dem_candidate_id = NO_STRING
+        self.rep_candidate_id = NO_STRING
+        self.dem_votes = 0
+        self.rep_votes = 0
+        self.other_votes = 0
+        self.total_votes = total_votes
+        self.category_code = None
+
+
+class ContestResults:
+    """All county results for one contest, keyed by county ID"""
+
+    __slots__ = ('contest_id', 'results')
+
+    def __init__(self, contest_id):
+        self.contest_id = contest_id
+        self.results = {}
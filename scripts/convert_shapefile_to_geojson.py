@@ -1,16 +1,23 @@
 import geopandas as gpd
 import json
 
+from atomic_write import atomic_path
+from county_features import SHAPEFILE_PATH, assign_feature_ids
+
 # Read the shapefile
-shapefile_path = r"C:\Users\Shama\OneDrive\Documents\Course_Materials\CPT-236\Side_Projects\ARRealignment\Data\tl_2020_05_county20\tl_2020_05_county20.shp"
+shapefile_path = SHAPEFILE_PATH
 gdf = gpd.read_file(shapefile_path)
 
+# Sort by GEOID and number counties so the map can use FEATURE_ID as its promoteId
+gdf = assign_feature_ids(gdf)
+
 # Convert to GeoJSON (WGS84 - EPSG:4326 for web mapping)
 gdf_wgs84 = gdf.to_crs("EPSG:4326")
 
 # Save as GeoJSON
-output_path = r"C:\Users\Shama\OneDrive\Documents\Course_Materials\CPT-236\Side_Projects\ARRealignment\Data\tl_2020_05_county20.geojson"
-gdf_wgs84.to_file(output_path, driver='GeoJSON')
+output_path = "Data/tl_2020_05_county20.geojson"
+with atomic_path(output_path) as tmp_path:
+    gdf_wgs84.to_file(tmp_path, driver='GeoJSON')
 
 print(f"GeoJSON created successfully at: {output_path}")
 print(f"Number of counties: {len(gdf_wgs84)}")
@@ -0,0 +1,44 @@
+"""
+Stable integer feature IDs for Arkansas counties.
+
+Feature IDs come from the GEOID20 column of the 2020 TIGER county shapefile:
+counties are sorted by GEOID and numbered from 0. Both the GeoJSON export and
+the election results build use these IDs, so the map can recolor counties
+with feature state instead of matching county names in the browser.
+"""
+
+import geopandas as gpd
+
+SHAPEFILE_DIR = 'Data/tl_2020_05_county20'
+SHAPEFILE_PATH = f'{SHAPEFILE_DIR}/tl_2020_05_county20.shp'
+ATTRIBUTES_PATH = f'{SHAPEFILE_DIR}/tl_2020_05_county20.dbf'
+
+
+def county_key(county_str):
+    """Normalize a county name so election results and geometry agree"""
+    if county_str is None:
+        return None
+    key = str(county_str).strip().upper()
+    key = key.replace('_', ' ').replace('.', '')
+    if key.endswith(' COUNTY'):
+        key = key[:-len(' COUNTY')]
+    return ' '.join(key.split())
+
+
+def assign_feature_ids(gdf):
+    """Sort counties by GEOID and add an integer FEATURE_ID column"""
+    gdf = gdf.sort_values('GEOID20').reset_index(drop=True)
+    gdf['FEATURE_ID'] = range(len(gdf))
+    return gdf
+
+
+def load_county_features():
+    """Load county attributes (no geometry) with their feature IDs and interior points"""
+    attrs = gpd.read_file(ATTRIBUTES_PATH, ignore_geometry=True)
+    features = assign_feature_ids(attrs)[['FEATURE_ID', 'GEOID20', 'NAME20', 'INTPTLAT20', 'INTPTLON20']]
+    return features.astype({'INTPTLAT20': float, 'INTPTLON20': float})
+
+
+def build_feature_index(features):
+    """Map normalized county name -> feature ID"""
+    return {county_key(name): int(fid) for fid, name in zip(features['FEATURE_ID'], features['NAME20'])}
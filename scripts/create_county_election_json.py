@@ -1,35 +1,16 @@
+import argparse
 import pandas as pd
 import json
 from pathlib import Path
 import glob
 
-# Load county lookup
-county_lookup = pd.read_csv('Data/county_lookup.csv')
-location_to_county = dict(zip(county_lookup['Location ID'], county_lookup['County Name']))
-
-print(f"Loaded {len(location_to_county)} counties from lookup table")
-
-# Find all CSV files in Data folder and subfolders
-all_csv_files = []
-data_path = Path('Data')
-
-# Get all CSV files recursively
-for csv_file in data_path.rglob('*.csv'):
-    # Skip the lookup file and other non-election files
-    if 'lookup' not in csv_file.name.lower() and csv_file.stat().st_size > 0:
-        # SKIP 2024 files - they use Location IDs without reliable county mapping
-        # SKIP 2022 Location ID files (the ones in Data/ root), but ALLOW 2022/counties files
-        if '2024' in csv_file.name:
-            print(f"  [SKIP] {csv_file.name} - Location ID mapping unreliable")
-            continue
-        if '2022' in csv_file.name and 'counties' not in str(csv_file.parent):
-            print(f"  [SKIP] {csv_file.name} - Location ID format (use counties/ instead)")
-            continue
-        all_csv_files.append(csv_file)
-
-print(f"\nFound {len(all_csv_files)} CSV files (excluded 2024 Location ID files, using 2022 county precinct files):")
-for f in sorted(all_csv_files):
-    print(f"  {f}")
+from atomic_write import atomic_path
+from compact_results import ContestResults, CountyResult, StringTables
+from county_features import county_key, load_county_features, build_feature_index
+from results_delta import (
+    artifact_digest, build_delta, delta_path_for, dropped_contests, hashes_path_for, load_previous_hashes,
+    shard_hashes, version_id
+)
 
 # Known Democratic and Republican candidates for pattern matching
 DEMOCRATIC_PATTERNS = [
@@ -70,78 +51,82 @@ CATEGORIZATION_SYSTEM = {
     ]
 }
 
-def calculate_competitiveness(dem_votes, rep_votes):
-    """Calculate competitiveness category and margin"""
+# Fixed palette for map feature state: one entry per category, in CATEGORIZATION_SYSTEM order.
+# Feature-state arrays store the index into this list, NO_CATEGORY_CODE for a county in the
+# contest without a category (No Data / Unknown) and NOT_IN_CONTEST_CODE for a county with no result.
+CATEGORY_PALETTE = []
+for party in ('Republican', 'Tossup', 'Democratic'):
+    for cat in CATEGORIZATION_SYSTEM[party]:
+        CATEGORY_PALETTE.append({
+            'code': len(CATEGORY_PALETTE),
+            'party': party,
+            'category': cat['category'],
+            'color': cat['color']
+        })
+CATEGORY_CODES = {(entry['party'], entry['category']): entry['code'] for entry in CATEGORY_PALETTE}
+NO_CATEGORY_CODE = -1
+NO_CATEGORY_COLOR = '#cccccc'
+NOT_IN_CONTEST_CODE = -3
+NOT_IN_CONTEST_COLOR = '#f0f0f0'           # the map's default fill
+
+NO_DATA_CODE = NO_CATEGORY_CODE        # no two-party votes
+UNKNOWN_CODE = -2                      # margin outside every category range
+
+def competitiveness_code(dem_votes, rep_votes):
+    """Calculate the competitiveness category code (index into CATEGORY_PALETTE)"""
     total = dem_votes + rep_votes
     if total == 0:
-        return {
-            'category': 'No Data',
-            'margin': 0,
-            'margin_pct': 'EVEN',
-            'color': '#cccccc',
-            'winner': None
-        }
+        return NO_DATA_CODE
     
     dem_pct = (dem_votes / total) * 100
     rep_pct = (rep_votes / total) * 100
     margin_pct = abs(dem_pct - rep_pct)
     
-    # Determine winner and margin direction
     if rep_pct > dem_pct:
-        winner = 'Republican'
-        margin = margin_pct
-        margin_formatted = f"R+{margin:.2f}"
-        
-        # Find category
-        for cat in CATEGORIZATION_SYSTEM['Republican']:
-            if margin >= cat['min'] and margin < cat['max']:
-                return {
-                    'category': f"{cat['category']} Republican",
-                    'margin': margin,
-                    'margin_pct': margin_formatted,
-                    'color': cat['color'],
-                    'winner': 'Republican',
-                    'dem_pct': round(dem_pct, 2),
-                    'rep_pct': round(rep_pct, 2)
-                }
+        party = 'Republican'
     elif dem_pct > rep_pct:
-        winner = 'Democratic'
-        margin = margin_pct
-        margin_formatted = f"D+{margin:.2f}"
-        
-        # Find category
-        for cat in CATEGORIZATION_SYSTEM['Democratic']:
-            if margin >= cat['min'] and margin < cat['max']:
-                return {
-                    'category': f"{cat['category']} Democratic",
-                    'margin': margin,
-                    'margin_pct': margin_formatted,
-                    'color': cat['color'],
-                    'winner': 'Democratic',
-                    'dem_pct': round(dem_pct, 2),
-                    'rep_pct': round(rep_pct, 2)
-                }
+        party = 'Democratic'
     else:
         # Exact tie
-        return {
-            'category': 'Tossup',
-            'margin': 0,
-            'margin_pct': 'EVEN',
-            'color': '#f7f7f7',
-            'winner': 'Tossup',
-            'dem_pct': round(dem_pct, 2),
-            'rep_pct': round(rep_pct, 2)
-        }
+        return CATEGORY_CODES[('Tossup', 'Tossup')]
+    
+    # Find category
+    for cat in CATEGORIZATION_SYSTEM[party]:
+        if margin_pct >= cat['min'] and margin_pct < cat['max']:
+            return CATEGORY_CODES[(party, cat['category'])]
     
     # Fallback if no category matched
-    return {
-        'category': 'Unknown',
-        'margin': margin_pct,
-        'margin_pct': f"{'R' if winner == 'Republican' else 'D'}+{margin_pct:.2f}",
-        'color': '#cccccc',
-        'winner': winner,
-        'dem_pct': round(dem_pct, 2),
-        'rep_pct': round(rep_pct, 2)
+    return UNKNOWN_CODE
+
+def describe_competitiveness(category_code, dem_votes, rep_votes):
+    """Expand a category code into (margin_pct, winner, competitiveness) for the public JSON"""
+    total = dem_votes + rep_votes
+    if category_code == NO_DATA_CODE:
+        return 0, 'NONE', {'category': 'No Data', 'party': None, 'code': 'NO_DATA', 'color': NO_CATEGORY_COLOR}
+    
+    dem_pct = (dem_votes / total) * 100
+    rep_pct = (rep_votes / total) * 100
+    margin_pct = abs(dem_pct - rep_pct)
+    
+    if rep_pct > dem_pct:
+        party, winner, prefix = 'Republican', 'REP', 'R'
+    elif dem_pct > rep_pct:
+        party, winner, prefix = 'Democratic', 'DEM', 'D'
+    else:
+        entry = CATEGORY_PALETTE[category_code]
+        return 0, 'NONE', {'category': 'Tossup', 'party': None, 'code': 'TOSSUP', 'color': entry['color']}
+    
+    if category_code == UNKNOWN_CODE:
+        category_name, color = 'Unknown', NO_CATEGORY_COLOR
+    else:
+        entry = CATEGORY_PALETTE[category_code]
+        category_name, color = entry['category'], entry['color']
+    
+    return margin_pct, winner, {
+        'category': category_name,
+        'party': party,
+        'code': f"{prefix}_{category_name.upper()}",
+        'color': color
     }
 
 def identify_party(candidate_name, party_info=''):
@@ -255,8 +240,9 @@ def normalize_candidate_name(candidate_str):
     
     return name.strip()
 
-def process_csv_file(csv_path, location_to_county):
-    """Process a single CSV file and return structured data"""
+
+def process_csv_file(csv_path, location_to_county, strings):
+    """Process a single CSV file and return {category: {contest_key: ContestResults}}"""
     print(f"\nProcessing {csv_path.name}...")
     
     try:
@@ -296,10 +282,8 @@ def process_csv_file(csv_path, location_to_county):
                 
                 contest_key = contest_name.replace(' ', '_').replace('.', '').replace(',', '').lower()
                 
-                results[category][contest_key] = {
-                    'contest_name': contest_name,
-                    'results': {}
-                }
+                contest_results = ContestResults(strings.contests.intern(contest_name))
+                results[category][contest_key] = contest_results
                 
                 # Process by county
                 for location_id in contest_data['Location ID'].unique():
@@ -309,14 +293,10 @@ def process_csv_file(csv_path, location_to_county):
                     
                     county_data = contest_data[contest_data['Location ID'] == location_id]
                     
-                    county_result = {
-                        'total_votes': int(county_data['Total Votes'].iloc[0]) if len(county_data) > 0 and pd.notna(county_data['Total Votes'].iloc[0]) else 0,
-                        'dem_votes': 0,
-                        'rep_votes': 0,
-                        'other_votes': 0,
-                        'dem_candidate': None,
-                        'rep_candidate': None
-                    }
+                    county_result = CountyResult(
+                        strings.counties.intern(county_name.upper()),
+                        int(county_data['Total Votes'].iloc[0]) if len(county_data) > 0 and pd.notna(county_data['Total Votes'].iloc[0]) else 0
+                    )
                     
                     for _, row in county_data.iterrows():
                         candidate_name = row['Candidate Name']
@@ -325,21 +305,20 @@ def process_csv_file(csv_path, location_to_county):
                         party = identify_party(candidate_name, contest_name)
                         
                         if party == 'dem':
-                            county_result['dem_votes'] += votes
-                            if not county_result['dem_candidate']:
-                                county_result['dem_candidate'] = normalize_candidate_name(candidate_name)
+                            county_result.dem_votes += votes
+                            if not strings.candidates.lookup(county_result.dem_candidate_id):
+                                county_result.dem_candidate_id = strings.candidates.intern(normalize_candidate_name(candidate_name))
                         elif party == 'rep':
-                            county_result['rep_votes'] += votes
-                            if not county_result['rep_candidate']:
-                                county_result['rep_candidate'] = normalize_candidate_name(candidate_name)
+                            county_result.rep_votes += votes
+                            if not strings.candidates.lookup(county_result.rep_candidate_id):
+                                county_result.rep_candidate_id = strings.candidates.intern(normalize_candidate_name(candidate_name))
                         else:
-                            county_result['other_votes'] += votes
+                            county_result.other_votes += votes
                     
                     # Add competitiveness calculation
-                    comp_data = calculate_competitiveness(county_result['dem_votes'], county_result['rep_votes'])
-                    county_result.update(comp_data)
+                    county_result.category_code = competitiveness_code(county_result.dem_votes, county_result.rep_votes)
                     
-                    results[category][contest_key]['results'][county_name.upper()] = county_result
+                    contest_results.results[county_result.county_id] = county_result
         
         elif has_office and has_county:
             # Old format (pre-2022) - has columns like: office, candidate, party, county, votes
@@ -385,10 +364,8 @@ def process_csv_file(csv_path, location_to_county):
                 
                 contest_key = office_name.replace(' ', '_').replace('.', '').replace(',', '').lower()
                 
-                results[category][contest_key] = {
-                    'contest_name': office_name,
-                    'results': {}
-                }
+                contest_results = ContestResults(strings.contests.intern(office_name))
+                results[category][contest_key] = contest_results
                 
                 # Filter to only county-level results first (not precinct level)
                 county_level_data = office_data.copy()
@@ -404,14 +381,7 @@ def process_csv_file(csv_path, location_to_county):
                     # Get data for this specific county
                     county_data = county_level_data[county_level_data[county_col] == county_raw]
                     
-                    county_result = {
-                        'total_votes': 0,
-                        'dem_votes': 0,
-                        'rep_votes': 0,
-                        'other_votes': 0,
-                        'dem_candidate': None,
-                        'rep_candidate': None
-                    }
+                    county_result = CountyResult(strings.counties.intern(county_norm))
                     
                     for _, row in county_data.iterrows():
                         candidate_name = row[candidate_col]
@@ -428,26 +398,25 @@ def process_csv_file(csv_path, location_to_county):
                         
                         party_val = row[party_col] if party_col else ''
                         
-                        county_result['total_votes'] += votes
+                        county_result.total_votes += votes
                         
                         party = identify_party(candidate_name, party_val)
                         
                         if party == 'dem':
-                            county_result['dem_votes'] += votes
-                            if not county_result['dem_candidate']:
-                                county_result['dem_candidate'] = normalize_candidate_name(candidate_name)
+                            county_result.dem_votes += votes
+                            if not strings.candidates.lookup(county_result.dem_candidate_id):
+                                county_result.dem_candidate_id = strings.candidates.intern(normalize_candidate_name(candidate_name))
                         elif party == 'rep':
-                            county_result['rep_votes'] += votes
-                            if not county_result['rep_candidate']:
-                                county_result['rep_candidate'] = normalize_candidate_name(candidate_name)
+                            county_result.rep_votes += votes
+                            if not strings.candidates.lookup(county_result.rep_candidate_id):
+                                county_result.rep_candidate_id = strings.candidates.intern(normalize_candidate_name(candidate_name))
                         else:
-                            county_result['other_votes'] += votes
+                            county_result.other_votes += votes
                     
                     # Add competitiveness calculation
-                    comp_data = calculate_competitiveness(county_result['dem_votes'], county_result['rep_votes'])
-                    county_result.update(comp_data)
+                    county_result.category_code = competitiveness_code(county_result.dem_votes, county_result.rep_votes)
                     
-                    results[category][contest_key]['results'][county_norm] = county_result
+                    contest_results.results[county_result.county_id] = county_result
         
         return results
         
@@ -455,39 +424,76 @@ def process_csv_file(csv_path, location_to_county):
         print(f"  [ERROR] processing {csv_path.name}: {e}")
         return None
 
-# Build results by year
-results_by_year = {}
 
-for csv_file in sorted(all_csv_files):
-    year = extract_year_from_filename(csv_file)
+def load_location_lookup(lookup_path='Data/county_lookup.csv'):
+    """Load the Location ID -> county name lookup"""
+    county_lookup = pd.read_csv(lookup_path)
+    location_to_county = dict(zip(county_lookup['Location ID'], county_lookup['County Name']))
+    print(f"Loaded {len(location_to_county)} counties from lookup table")
+    return location_to_county
+
+def find_election_csv_files(data_path=Path('Data')):
+    """Find all election CSV files in the Data folder and subfolders"""
+    all_csv_files = []
     
-    if not year:
-        print(f"[WARN] Could not extract year from {csv_file.name}")
-        continue
+    # Get all CSV files recursively
+    for csv_file in data_path.rglob('*.csv'):
+        # Skip the lookup files, the precinct -> district index and other non-election files
+        name = csv_file.name.lower()
+        if 'lookup' not in name and 'district_index' not in name and csv_file.stat().st_size > 0:
+            # SKIP 2024 files - they use Location IDs without reliable county mapping
+            # SKIP 2022 Location ID files (the ones in Data/ root), but ALLOW 2022/counties files
+            if '2024' in csv_file.name:
+                print(f"  [SKIP] {csv_file.name} - Location ID mapping unreliable")
+                continue
+            if '2022' in csv_file.name and 'counties' not in str(csv_file.parent):
+                print(f"  [SKIP] {csv_file.name} - Location ID format (use counties/ instead)")
+                continue
+            all_csv_files.append(csv_file)
     
-    if year not in results_by_year:
-        results_by_year[year] = {}
+    print(f"\nFound {len(all_csv_files)} CSV files (excluded 2024 Location ID files, using 2022 county precinct files):")
+    for f in sorted(all_csv_files):
+        print(f"  {f}")
     
-    file_results = process_csv_file(csv_file, location_to_county)
+    return all_csv_files
+
+def build_results_by_year(all_csv_files, location_to_county, strings):
+    """Process every CSV file and merge results by year"""
+    results_by_year = {}
     
-    if file_results:
-        # Merge results into year
-        for category, contests in file_results.items():
-            if category not in results_by_year[year]:
-                results_by_year[year][category] = {}
-            
-            # Merge contests, combining data if contest appears in multiple files
-            for contest_key, contest_data in contests.items():
-                if contest_key not in results_by_year[year][category]:
-                    results_by_year[year][category][contest_key] = contest_data
-                else:
-                    # Merge county results
-                    for county, county_data in contest_data['results'].items():
-                        if county not in results_by_year[year][category][contest_key]['results']:
-                            results_by_year[year][category][contest_key]['results'][county] = county_data
+    for csv_file in sorted(all_csv_files):
+        year = extract_year_from_filename(csv_file)
+        
+        if not year:
+            print(f"[WARN] Could not extract year from {csv_file.name}")
+            continue
+        
+        if year not in results_by_year:
+            results_by_year[year] = {}
+        
+        file_results = process_csv_file(csv_file, location_to_county, strings)
+        
+        if file_results:
+            # Merge results into year
+            for category, contests in file_results.items():
+                if category not in results_by_year[year]:
+                    results_by_year[year][category] = {}
+                
+                # Merge contests, combining data if contest appears in multiple files
+                for contest_key, contest_data in contests.items():
+                    if contest_key not in results_by_year[year][category]:
+                        results_by_year[year][category][contest_key] = contest_data
+                    else:
+                        # Merge county results
+                        merged = results_by_year[year][category][contest_key].results
+                        for county_id, county_data in contest_data.results.items():
+                            if county_id not in merged:
+                                merged[county_id] = county_data
+    
+    return results_by_year
 
 # Filter out contests with no Democratic candidate or no major party competition
-def filter_contested_races(results_by_year):
+def filter_contested_races(results_by_year, strings):
     """Remove contests where there's no Dem candidate or both parties are missing"""
     filtered_results = {}
     
@@ -502,10 +508,10 @@ def filter_contested_races(results_by_year):
                 has_dem_candidate = False
                 has_rep_candidate = False
                 
-                for county, county_data in contest_data['results'].items():
-                    if county_data.get('dem_candidate'):
+                for county_data in contest_data.results.values():
+                    if strings.candidates.lookup(county_data.dem_candidate_id):
                         has_dem_candidate = True
-                    if county_data.get('rep_candidate'):
+                    if strings.candidates.lookup(county_data.rep_candidate_id):
                         has_rep_candidate = True
                     
                     if has_dem_candidate and has_rep_candidate:
@@ -525,13 +531,33 @@ def filter_contested_races(results_by_year):
     
     return filtered_results
 
-# Apply filtering
-print("\nFiltering out uncontested races...")
-results_by_year = filter_contested_races(results_by_year)
+def county_result_to_dict(county_data, strings, year, contest_name):
+    """Convert a compact CountyResult into the public per-county JSON shape"""
+    county_name = strings.counties.lookup(county_data.county_id)
+    dem_votes = county_data.dem_votes
+    rep_votes = county_data.rep_votes
+    margin_pct, winner, competitiveness = describe_competitiveness(county_data.category_code, dem_votes, rep_votes)
+    
+    return {
+        'county': county_name,
+        'contest': contest_name,
+        'year': year,
+        'dem_candidate': strings.candidates.lookup(county_data.dem_candidate_id),
+        'rep_candidate': strings.candidates.lookup(county_data.rep_candidate_id),
+        'dem_votes': dem_votes,
+        'rep_votes': rep_votes,
+        'other_votes': county_data.other_votes,
+        'total_votes': county_data.total_votes,
+        'two_party_total': dem_votes + rep_votes,
+        'margin': abs(dem_votes - rep_votes),
+        'margin_pct': round(margin_pct, 2),  # Format to 2 decimal places like Ballotpedia
+        'winner': winner,
+        'competitiveness': competitiveness
+    }
 
 # Restructure data to match the new format
-def restructure_to_new_format(results_by_year):
-    """Convert to the new nested JSON format"""
+def restructure_to_new_format(results_by_year, strings):
+    """Convert the compact results into the nested public JSON format"""
     restructured = {}
     
     for year, categories in results_by_year.items():
@@ -541,112 +567,189 @@ def restructure_to_new_format(results_by_year):
             restructured[year][category] = {}
             
             for contest_key, contest_data in contests.items():
+                contest_name = strings.contests.lookup(contest_data.contest_id)
                 restructured_contest = {
-                    'contest_name': contest_data['contest_name'],
+                    'contest_name': contest_name,
                     'results': {}
                 }
                 
                 # Restructure each county's data
-                for county_name, county_data in contest_data['results'].items():
-                    # Get competitiveness info
-                    margin = county_data.get('margin', 0)
-                    category_name = county_data.get('category', 'Unknown')
-                    color = county_data.get('color', '#cccccc')
-                    winner = county_data.get('winner')
-                    
-                    # Determine party for competitiveness
-                    comp_party = None
-                    comp_code = category_name.upper().replace(' ', '_')
-                    if winner == 'Republican':
-                        comp_party = 'Republican'
-                        comp_code = f"R_{category_name.upper().replace(' REPUBLICAN', '')}"
-                    elif winner == 'Democratic':
-                        comp_party = 'Democratic'
-                        comp_code = f"D_{category_name.upper().replace(' DEMOCRATIC', '')}"
-                    
-                    restructured_contest['results'][county_name] = {
-                        'county': county_name,
-                        'contest': contest_data['contest_name'],
-                        'year': year,
-                        'dem_candidate': county_data.get('dem_candidate'),
-                        'rep_candidate': county_data.get('rep_candidate'),
-                        'dem_votes': county_data.get('dem_votes', 0),
-                        'rep_votes': county_data.get('rep_votes', 0),
-                        'other_votes': county_data.get('other_votes', 0),
-                        'total_votes': county_data.get('total_votes', 0),
-                        'two_party_total': county_data.get('dem_votes', 0) + county_data.get('rep_votes', 0),
-                        'margin': abs(county_data.get('dem_votes', 0) - county_data.get('rep_votes', 0)),
-                        'margin_pct': round(margin, 2),  # Format to 2 decimal places like Ballotpedia
-                        'winner': 'REP' if winner == 'Republican' else 'DEM' if winner == 'Democratic' else 'NONE',
-                        'competitiveness': {
-                            'category': category_name.replace(' Republican', '').replace(' Democratic', ''),
-                            'party': comp_party,
-                            'code': comp_code,
-                            'color': color
-                        }
-                    }
+                for county_id, county_data in contest_data.results.items():
+                    county_name = strings.counties.lookup(county_id)
+                    restructured_contest['results'][county_name] = county_result_to_dict(county_data, strings, year, contest_name)
                 
                 restructured[year][category][contest_key] = restructured_contest
     
     return restructured
 
-print("\nRestructuring data format...")
-restructured_data = restructure_to_new_format(results_by_year)
+def build_feature_state(results_by_year, strings, features):
+    """Join results onto county geometry: per contest, one category code per feature ID"""
+    feature_index = build_feature_index(features)
+    county_features = [feature_index.get(county_key(name)) for name in strings.counties.values]
+    contests = {}
+    unmatched = {}
+
+    for year, categories in results_by_year.items():
+        for category, contest_group in categories.items():
+            for contest_key, contest_data in contest_group.items():
+                codes = [NOT_IN_CONTEST_CODE] * len(features)
+                for county_id, county_data in contest_data.results.items():
+                    feature_id = county_features[county_id]
+                    if feature_id is None:
+                        county_name = strings.counties.lookup(county_id)
+                        unmatched.setdefault(county_name, []).append(f"{year}/{category}/{contest_key}")
+                        continue
+                    # No Data and Unknown (0 < |margin| < 0.5) share the grey the results JSON gives them
+                    codes[feature_id] = county_data.category_code if county_data.category_code >= 0 else NO_CATEGORY_CODE
+                contests[f"{year}||{category}||{contest_key}"] = codes
+
+    if unmatched:
+        for county_name, contest_ids in sorted(unmatched.items()):
+            print(f"  [ERROR] County '{county_name}' has no matching geometry ({len(contest_ids)} contests, e.g. {contest_ids[0]})")
+        raise ValueError(f"{len(unmatched)} county names in results do not match {len(features)} county features")
 
-# Create final JSON structure with metadata
-output = {
-    'metadata': {
-        'state': 'Arkansas',
-        'state_abbreviation': 'AR',
-        'source': 'OpenElections Project & Arkansas Secretary of State',
-        'years_included': sorted(list(restructured_data.keys())),
-        'focus': 'Clean geographic political patterns',
-        'processed_date': '2025-01-07',
-        'categorization_system': {
-            'competitiveness_scale': {
-                'Republican': [
-                    {'category': 'Annihilation', 'range': 'R+40%+', 'color': '#67000d'},
-                    {'category': 'Dominant', 'range': 'R+30-40%', 'color': '#a50f15'},
-                    {'category': 'Stronghold', 'range': 'R+20-30%', 'color': '#cb181d'},
-                    {'category': 'Safe', 'range': 'R+10-20%', 'color': '#ef3b2c'},
-                    {'category': 'Likely', 'range': 'R+5.5-10%', 'color': '#fb6a4a'},
-                    {'category': 'Lean', 'range': 'R+1-5.5%', 'color': '#fcae91'},
-                    {'category': 'Tilt', 'range': 'R+0.5-1%', 'color': '#fee8c8'}
-                ],
-                'Tossup': [
-                    {'category': 'Tossup', 'range': '±0.5%', 'color': '#f7f7f7'}
-                ],
-                'Democratic': [
-                    {'category': 'Tilt', 'range': 'D+0.5-1%', 'color': '#e1f5fe'},
-                    {'category': 'Lean', 'range': 'D+1-5.5%', 'color': '#c6dbef'},
-                    {'category': 'Likely', 'range': 'D+5.5-10%', 'color': '#9ecae1'},
-                    {'category': 'Safe', 'range': 'D+10-20%', 'color': '#6baed6'},
-                    {'category': 'Stronghold', 'range': 'D+20-30%', 'color': '#3182bd'},
-                    {'category': 'Dominant', 'range': 'D+30-40%', 'color': '#08519c'},
-                    {'category': 'Annihilation', 'range': 'D+40%+', 'color': '#08306b'}
+    return {
+        'id_property': 'FEATURE_ID',
+        'palette': CATEGORY_PALETTE,
+        'no_category': {'code': NO_CATEGORY_CODE, 'color': NO_CATEGORY_COLOR},
+        'not_in_contest': {'code': NOT_IN_CONTEST_CODE, 'color': NOT_IN_CONTEST_COLOR},
+        'features': [
+            {'id': int(fid), 'geoid': geoid, 'name': name}
+            for fid, geoid, name in zip(features['FEATURE_ID'], features['GEOID20'], features['NAME20'])
+        ],
+        'contests': contests
+    }
+
+def build_output(restructured_data, feature_state):
+    """Create final JSON structure with metadata"""
+    return {
+        'metadata': {
+            'state': 'Arkansas',
+            'state_abbreviation': 'AR',
+            'source': 'OpenElections Project & Arkansas Secretary of State',
+            'years_included': sorted(list(restructured_data.keys())),
+            'focus': 'Clean geographic political patterns',
+            'processed_date': '2025-01-07',
+            'categorization_system': {
+                'competitiveness_scale': {
+                    'Republican': [
+                        {'category': 'Annihilation', 'range': 'R+40%+', 'color': '#67000d'},
+                        {'category': 'Dominant', 'range': 'R+30-40%', 'color': '#a50f15'},
+                        {'category': 'Stronghold', 'range': 'R+20-30%', 'color': '#cb181d'},
+                        {'category': 'Safe', 'range': 'R+10-20%', 'color': '#ef3b2c'},
+                        {'category': 'Likely', 'range': 'R+5.5-10%', 'color': '#fb6a4a'},
+                        {'category': 'Lean', 'range': 'R+1-5.5%', 'color': '#fcae91'},
+                        {'category': 'Tilt', 'range': 'R+0.5-1%', 'color': '#fee8c8'}
+                    ],
+                    'Tossup': [
+                        {'category': 'Tossup', 'range': '±0.5%', 'color': '#f7f7f7'}
+                    ],
+                    'Democratic': [
+                        {'category': 'Tilt', 'range': 'D+0.5-1%', 'color': '#e1f5fe'},
+                        {'category': 'Lean', 'range': 'D+1-5.5%', 'color': '#c6dbef'},
+                        {'category': 'Likely', 'range': 'D+5.5-10%', 'color': '#9ecae1'},
+                        {'category': 'Safe', 'range': 'D+10-20%', 'color': '#6baed6'},
+                        {'category': 'Stronghold', 'range': 'D+20-30%', 'color': '#3182bd'},
+                        {'category': 'Dominant', 'range': 'D+30-40%', 'color': '#08519c'},
+                        {'category': 'Annihilation', 'range': 'D+40%+', 'color': '#08306b'}
+                    ]
+                },
+                'office_types': ['presidential', 'us_senate', 'governor', 'lt_governor', 'statewide'],
+                'enhanced_features': [
+                    'Competitiveness categorization for each county',
+                    'Contest type classification (presidential/statewide/etc)',
+                    'Color coding compatible with political geography visualization',
+                    'Candidate name normalization'
                 ]
-            },
-            'office_types': ['presidential', 'us_senate', 'governor', 'lt_governor', 'statewide'],
-            'enhanced_features': [
-                'Competitiveness categorization for each county',
-                'Contest type classification (presidential/statewide/etc)',
-                'Color coding compatible with political geography visualization',
-                'Candidate name normalization'
-            ]
-        }
-    },
-    'results_by_year': restructured_data
-}
+            }
+        },
+        'results_by_year': restructured_data,
+        'feature_state': feature_state
+    }
+
 
-# Save to JSON file
-output_path = 'Data/arkansas_county_election_results.json'
-with open(output_path, 'w') as f:
-    json.dump(output, f, indent=2)
+def main():
+    parser = argparse.ArgumentParser(description='Build Data/arkansas_county_election_results.json from the election CSVs')
+    parser.add_argument('--allow-removals', action='store_true',
+                        help='write the artifact even if it drops contests the existing one has')
+    args = parser.parse_args()
+    
+    # Load county lookup
+    location_to_county = load_location_lookup()
+    
+    # Find all CSV files in Data folder and subfolders
+    all_csv_files = find_election_csv_files()
+    
+    # Build results by year
+    strings = StringTables()
+    results_by_year = build_results_by_year(all_csv_files, location_to_county, strings)
+    
+    # Apply filtering
+    print("\nFiltering out uncontested races...")
+    results_by_year = filter_contested_races(results_by_year, strings)
+    
+    print("\nJoining results onto county features...")
+    feature_state = build_feature_state(results_by_year, strings, load_county_features())
+    print(f"  {len(feature_state['features'])} features, {len(feature_state['contests'])} contests")
+    
+    # Convert to the public JSON shape only at the output boundary
+    print("\nRestructuring data format...")
+    restructured_data = restructure_to_new_format(results_by_year, strings)
+    output = build_output(restructured_data, feature_state)
+    
+    output_path = 'Data/arkansas_county_election_results.json'
+    
+    # Delta against the previous build: compare per-contest hashes first, diff only changed shards
+    new_hashes = shard_hashes(output)
+    old_hashes = load_previous_hashes(output_path)
+    
+    # The committed artifact has years whose source CSVs are not in Data/; never drop them silently
+    dropped = dropped_contests(old_hashes or {}, new_hashes)
+    if dropped and not args.allow_removals:
+        for year, category, contest_key in dropped:
+            print(f"  [ERROR] {year}/{category}/{contest_key} is in {output_path} but not in this build")
+        raise SystemExit(f"{len(dropped)} contests would be dropped from {output_path}; add their source CSVs "
+                         f"or rerun with --allow-removals. The existing artifact was left unchanged.")
+    
+    delta = None
+    if old_hashes is not None:
+        def load_previous_output():
+            with open(output_path) as f:
+                return json.load(f)
+        delta = build_delta(old_hashes, new_hashes, output, load_previous_output)
+    
+    # Save to JSON file
+    with atomic_path(output_path) as tmp_path:
+        with open(tmp_path, 'w') as f:
+            json.dump(output, f, indent=2)
+    
+    with atomic_path(hashes_path_for(output_path)) as tmp_path:
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': version_id(new_hashes),
+                'artifact_sha256': artifact_digest(output_path),
+                'shards': new_hashes
+            }, f, indent=2)
+    
+    print(f"\n[SUCCESS] Created {output_path}")
+    
+    if delta is not None and delta['from_version'] == delta['to_version']:
+        # Keep the last real delta so clients one version behind can still catch up
+        print(f"  Unchanged since {delta['from_version']}, previous delta kept")
+    elif delta is not None:
+        delta_path = delta_path_for(output_path)
+        with atomic_path(delta_path) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                json.dump(delta, f, indent=2)
+        print(f"  Delta {delta['from_version']} -> {delta['to_version']}: "
+              f"{len(delta['changed'])} changed, {len(delta['added'])} added, {len(delta['removed'])} removed shards, "
+              f"{len(delta['patch'])} patch operations ({delta_path})")
+    print(f"\nTotal years: {len(results_by_year)}")
+    for year in sorted(results_by_year.keys()):
+        categories = results_by_year[year]
+        print(f"  {year}: {len(categories)} categories")
+        for category, contests in sorted(categories.items()):
+            print(f"    {category}: {len(contests)} contests")
 
-print(f"\n[SUCCESS] Created {output_path}")
-print(f"\nTotal years: {len(results_by_year)}")
-for year in sorted(results_by_year.keys()):
-    categories = results_by_year[year]
-    print(f"  {year}: {len(categories)} categories")
-    for category, contests in sorted(categories.items()):
-        print(f"    {category}: {len(contests)} contests")
+if __name__ == '__main__':
+    main()
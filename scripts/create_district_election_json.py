@@ -0,0 +1,329 @@
+"""
+Build district-level results (U.S. House, state senate, state house) from the
+precinct CSVs.
+
+create_county_election_json.py deliberately drops district contests. This
+script keeps them and aggregates them by district, using the `district`
+column (or the district number in the office name, as in the 2020 files).
+The same rows give a (county, precinct) -> district index per year and
+chamber. Statewide contests are re-aggregated into districts with one merge
+against that index and one groupby, instead of re-scanning files per district.
+County-wide absentee/early/provisional "precincts" are left out of the index;
+their votes are spread over the county's districts in proportion to each
+district's share of the contest's precinct votes. Each rollup contest records
+how much of the statewide vote it covers.
+
+Outputs:
+    Data/arkansas_district_election_results.json
+    Data/precinct_district_index.csv
+"""
+
+import json
+import re
+
+import pandas as pd
+
+from atomic_write import atomic_path
+from create_county_election_json import (
+    categorize_office, competitiveness_code, describe_competitiveness, extract_year_from_filename,
+    find_election_csv_files, identify_party, normalize_candidate_name, normalize_county_name
+)
+
+CHAMBERS = {
+    'us_house': 'U.S. House',
+    'state_senate': 'State Senate',
+    'state_house': 'State House',
+}
+
+# Statewide contest categories (from categorize_office) re-aggregated into every district plan
+STATEWIDE_ROLLUP_CATEGORIES = ('presidential', 'us_senate')
+
+OUTPUT_PATH = 'Data/arkansas_district_election_results.json'
+INDEX_PATH = 'Data/precinct_district_index.csv'
+
+DISTRICT_IN_OFFICE = re.compile(r'district\s+0*(\d+)', re.IGNORECASE)
+
+# Reporting units that are not places: absentee, early vote centers, provisional ballots, ...
+PSEUDO_PRECINCT = re.compile(
+    r'\b(?:ABSENTEE|ABS|EARLY|PROVISIONAL|MAIL|OVERSEAS|UOCAVA|MILITARY|FAILSAFE)\b|^(?:EV|AV|PV)\b'
+)
+
+
+def categorize_district_office(office_name):
+    """Return the chamber for a district contest, or None"""
+    office_lower = str(office_name).lower()
+    if 'special' in office_lower:
+        return None
+    if 'u.s. house' in office_lower or 'congress' in office_lower or office_lower.startswith('u.s. representative'):
+        return 'us_house'
+    if 'state senate' in office_lower or 'state senator' in office_lower:
+        return 'state_senate'
+    if 'state representative' in office_lower or 'state house' in office_lower:
+        return 'state_house'
+    return None
+
+
+def parse_district(office_name, district_value):
+    """District number from the office name ("... District 04") or the district column"""
+    match = DISTRICT_IN_OFFICE.search(str(office_name))
+    if match:
+        return int(match.group(1))
+    try:
+        return int(float(district_value))
+    except (TypeError, ValueError):
+        return None
+
+
+def contest_key_for(contest_name):
+    """Same contest keys as the county results JSON"""
+    return contest_name.replace(' ', '_').replace('.', '').replace(',', '').lower()
+
+
+def load_precinct_rows(all_csv_files):
+    """Load every county-name format CSV into one frame: year, county, precinct, office, district, party, candidate, votes"""
+    frames = []
+    for csv_file in sorted(all_csv_files):
+        year = extract_year_from_filename(csv_file)
+        if not year:
+            continue
+        df = pd.read_csv(csv_file, dtype=str, on_bad_lines='skip', encoding='utf-8', encoding_errors='ignore')
+        if not {'office', 'county', 'candidate', 'votes'}.issubset(df.columns):
+            continue
+        if 'reporting_level' in df.columns:
+            df = df[df['reporting_level'] == 'precinct']
+        frame = pd.DataFrame({
+            'year': year,
+            'county': df['county'].map(normalize_county_name),
+            'precinct': df['precinct'].str.strip().str.upper() if 'precinct' in df.columns else None,
+            'office': df['office'],
+            'district': df['district'] if 'district' in df.columns else None,
+            'party': df['party'] if 'party' in df.columns else '',
+            'candidate': df['candidate'],
+            'votes': pd.to_numeric(df['votes'].str.replace(',', ''), errors='coerce').fillna(0).astype('int64'),
+        })
+        frames.append(frame.dropna(subset=['county', 'office']))
+        print(f"  Loaded {len(frame):,} rows from {csv_file.name}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def add_party_column(rows):
+    """Classify each row as dem/rep/other, calling identify_party once per distinct (candidate, party)"""
+    pairs = rows[['candidate', 'party']].drop_duplicates()
+    pairs['side'] = [identify_party(candidate, party) for candidate, party in zip(pairs['candidate'], pairs['party'])]
+    return rows.merge(pairs, on=['candidate', 'party'], how='left')
+
+
+def build_district_index(district_rows):
+    """
+    (year, chamber, county, precinct) -> district from the district contests themselves.
+
+    Pseudo-precincts (absentee, early voting, ...) are county-wide and left out.
+    Some files (2008) list every precinct under each of its county's district
+    contests with 0 votes, so only districts where the precinct cast votes count;
+    a precinct with no votes in any district contest stays out of the index
+    (uncovered) rather than going to an arbitrary district. A precinct with votes
+    in two districts of the same chamber (split precincts, data errors) is
+    assigned to the district where it cast the most votes.
+    """
+    with_precinct = district_rows.dropna(subset=['precinct'])
+    with_precinct = with_precinct[~with_precinct['precinct'].str.contains(PSEUDO_PRECINCT)]
+    keys = ['year', 'chamber', 'county', 'precinct']
+    votes = with_precinct.groupby(keys + ['district'], as_index=False)['votes'].sum()
+    listed = votes[keys].drop_duplicates()
+    votes = votes[votes['votes'] > 0]
+    votes = votes.sort_values(keys + ['votes'], ascending=[True] * len(keys) + [False])
+    index = votes.drop_duplicates(subset=keys, keep='first')[keys + ['district']]
+
+    no_votes = len(listed) - len(index)
+    if no_votes:
+        print(f"  [WARN] {no_votes} precincts cast no votes in any district contest: left out of the index")
+    split = int((votes.groupby(keys).size() > 1).sum())
+    if split:
+        print(f"  [WARN] {split} split precincts (votes in more than one district): "
+              f"assigned to the district where they cast the most votes")
+    return index.reset_index(drop=True)
+
+
+def allocate_pseudo_precincts(rolled, pseudo_rows):
+    """
+    Spread pseudo-precinct votes over the county's districts.
+
+    Each district gets the share of the contest's precinct votes in that county
+    that fell in the district (per year, contest and district plan).
+    """
+    keys = ['year', 'contest_key', 'county', 'chamber']
+    by_district = rolled.groupby(keys + ['district'], as_index=False)['votes'].sum()
+    county_votes = by_district.groupby(keys)['votes'].transform('sum')
+    by_district = by_district[county_votes > 0]
+    by_district['share'] = by_district['votes'] / county_votes[county_votes > 0]
+
+    allocated = pseudo_rows.merge(by_district.drop(columns='votes'), on=keys[:-1])
+    allocated['votes'] = allocated['votes'] * allocated['share']
+    return allocated.drop(columns='share')
+
+
+def aggregate_by_district(rows, group_keys):
+    """Sum dem/rep/other votes and pick the first dem/rep candidate per group in one groupby"""
+    totals = rows.pivot_table(index=group_keys, columns='side', values='votes', aggfunc='sum', fill_value=0)
+    totals = totals.reindex(columns=['dem', 'rep', 'other'], fill_value=0)
+    candidates = {}
+    for side in ('dem', 'rep'):
+        side_rows = rows[rows['side'] == side].drop_duplicates(subset=group_keys)
+        candidates[side] = side_rows.set_index(group_keys)['candidate']
+    return totals, candidates
+
+
+def district_result_to_dict(district, year, contest_name, dem_votes, rep_votes, other_votes, dem_candidate, rep_candidate):
+    """Public per-district record (same fields as the county records, keyed by district)"""
+    margin_pct, winner, competitiveness = describe_competitiveness(
+        competitiveness_code(dem_votes, rep_votes), dem_votes, rep_votes
+    )
+    return {
+        'district': district,
+        'contest': contest_name,
+        'year': year,
+        'dem_candidate': normalize_candidate_name(dem_candidate) if isinstance(dem_candidate, str) else None,
+        'rep_candidate': normalize_candidate_name(rep_candidate) if isinstance(rep_candidate, str) else None,
+        'dem_votes': dem_votes,
+        'rep_votes': rep_votes,
+        'other_votes': other_votes,
+        'total_votes': dem_votes + rep_votes + other_votes,
+        'two_party_total': dem_votes + rep_votes,
+        'margin': abs(dem_votes - rep_votes),
+        'margin_pct': round(margin_pct, 2),
+        'winner': winner,
+        'competitiveness': competitiveness
+    }
+
+
+def add_results(results_by_year, totals, candidates, contest_names):
+    """Fill results_by_year[year][chamber][contest_key]['results'][district] from aggregated frames"""
+    for key, row in totals.iterrows():
+        year, chamber, contest_key, district = key
+        district_id = f"{district:02d}"
+        contest_name = contest_names[(year, chamber, contest_key)]
+        contest = results_by_year.setdefault(year, {}).setdefault(chamber, {}).setdefault(
+            contest_key, {'contest_name': contest_name, 'results': {}}
+        )
+        contest['results'][district_id] = district_result_to_dict(
+            district_id, year, contest_name,
+            # Allocated pseudo-precinct votes are fractional; round per district
+            int(round(row['dem'])), int(round(row['rep'])), int(round(row['other'])),
+            candidates['dem'].get(key), candidates['rep'].get(key)
+        )
+
+
+def add_coverage(results_by_year, rolled, allocated, cast):
+    """Record, per rollup contest, how much of the statewide vote was assigned to a district"""
+    keys = ['year', 'chamber', 'contest_key']
+    assigned = rolled.groupby(keys)['votes'].sum()
+    from_pseudo = allocated.groupby(keys)['votes'].sum()
+    for (year, chamber, contest_key), votes in assigned.items():
+        votes_cast = int(cast[(year, contest_key)])
+        coverage = {
+            'votes_cast': votes_cast,
+            'votes_assigned': int(round(votes)),
+            'votes_allocated_from_pseudo_precincts': int(round(from_pseudo.get((year, chamber, contest_key), 0))),
+            'pct': round(votes / votes_cast * 100, 1) if votes_cast else 0.0
+        }
+        results_by_year[year][chamber][contest_key]['coverage'] = coverage
+        print(f"  {year} {chamber} {contest_key}: {coverage['pct']}% of statewide votes assigned "
+              f"({coverage['votes_allocated_from_pseudo_precincts']:,} allocated from absentee/early)")
+
+
+def build_district_results(rows):
+    """Aggregate district contests and roll statewide contests up into districts"""
+    group_keys = ['year', 'chamber', 'contest_key', 'district']
+    results_by_year = {}
+
+    # District contests, aggregated by their own district number
+    offices = pd.DataFrame({'office': rows['office'].unique()})
+    offices['chamber'] = offices['office'].map(categorize_district_office)
+    offices['category'] = offices['office'].map(categorize_office)
+    rows = rows.merge(offices, on='office', how='left')
+
+    district_rows = rows[rows['chamber'].notna()].copy()
+    district_rows['district'] = [parse_district(o, d) for o, d in zip(district_rows['office'], district_rows['district'])]
+    district_rows = district_rows.dropna(subset=['district'])
+    district_rows['district'] = district_rows['district'].astype(int)
+    district_rows['contest_key'] = district_rows['chamber']
+
+    print(f"\nAggregating {len(district_rows):,} district contest rows...")
+    totals, candidates = aggregate_by_district(district_rows, group_keys)
+    contest_names = {(year, chamber, chamber): CHAMBERS[chamber] for year, chamber, _, _ in totals.index}
+    add_results(results_by_year, totals, candidates, contest_names)
+
+    # Precinct -> district index, reused for every statewide contest
+    print("\nBuilding (county, precinct) -> district index...")
+    index = build_district_index(district_rows)
+    print(f"  {len(index):,} precinct assignments")
+
+    # Statewide contests: one merge against the index, one groupby for all districts and plans
+    statewide_rows = rows[rows['category'].isin(STATEWIDE_ROLLUP_CATEGORIES)].drop(columns=['chamber', 'district'])
+    statewide_rows['contest_key'] = statewide_rows['office'].map(contest_key_for)
+    # Keep only contests with a Democratic candidate, as filter_contested_races does for counties
+    contested = statewide_rows.loc[statewide_rows['side'] == 'dem', ['year', 'contest_key']].drop_duplicates()
+    statewide_rows = statewide_rows.merge(contested, on=['year', 'contest_key'])
+    cast = statewide_rows.groupby(['year', 'contest_key'])['votes'].sum()
+
+    statewide_rows = statewide_rows.dropna(subset=['precinct'])
+    pseudo = statewide_rows['precinct'].str.contains(PSEUDO_PRECINCT)
+    rolled = statewide_rows[~pseudo].merge(index, on=['year', 'county', 'precinct'], how='inner')
+    allocated = allocate_pseudo_precincts(rolled, statewide_rows[pseudo])
+    rolled = pd.concat([rolled, allocated], ignore_index=True)
+
+    totals, candidates = aggregate_by_district(rolled, group_keys)
+    contest_names = dict(zip(
+        zip(rolled['year'], rolled['chamber'], rolled['contest_key']), rolled['office']
+    ))
+    add_results(results_by_year, totals, candidates, contest_names)
+
+    print("\nStatewide rollup coverage:")
+    add_coverage(results_by_year, rolled, allocated, cast)
+
+    return results_by_year, index
+
+
+def main():
+    all_csv_files = find_election_csv_files()
+
+    print("\nLoading precinct rows...")
+    rows = add_party_column(load_precinct_rows(all_csv_files))
+
+    results_by_year, index = build_district_results(rows)
+
+    output = {
+        'metadata': {
+            'state': 'Arkansas',
+            'state_abbreviation': 'AR',
+            'source': 'OpenElections Project & Arkansas Secretary of State',
+            'years_included': sorted(results_by_year.keys()),
+            'chambers': CHAMBERS,
+            'statewide_rollups': list(STATEWIDE_ROLLUP_CATEGORIES),
+            'notes': [
+                'District contests are keyed by the chamber (e.g. results_by_year[year]["us_house"]["us_house"]).',
+                'Statewide contests are re-aggregated into each district plan under their county-results contest key.',
+                'Statewide rollups only cover precinct-level files; precincts without a district contest in that year are not assigned.',
+                'Absentee/early/provisional votes are allocated to districts by each district\'s share of the county\'s precinct votes.',
+                'Each rollup contest has a "coverage" object: votes_cast statewide, votes_assigned to districts and pct.'
+            ]
+        },
+        'results_by_year': results_by_year
+    }
+
+    with atomic_path(OUTPUT_PATH) as tmp_path:
+        with open(tmp_path, 'w') as f:
+            json.dump(output, f, indent=2)
+
+    with atomic_path(INDEX_PATH) as tmp_path:
+        index.to_csv(tmp_path, index=False)
+
+    print(f"\n[SUCCESS] Created {OUTPUT_PATH} and {INDEX_PATH}")
+    for year in sorted(results_by_year):
+        for chamber, contests in sorted(results_by_year[year].items()):
+            summary = ', '.join(f"{key} ({len(c['results'])} districts)" for key, c in sorted(contests.items()))
+            print(f"  {year} {chamber}: {summary}")
+
+
+if __name__ == '__main__':
+    main()
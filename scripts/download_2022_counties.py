@@ -5,6 +5,8 @@ import requests
 import os
 from pathlib import Path
 
+from atomic_write import write_bytes_atomic
+
 # GitHub API URL for the 2022/counties directory
 api_url = "https://api.github.com/repos/openelections/openelections-data-ar/contents/2022/counties"
 
@@ -34,8 +36,7 @@ for i, file_info in enumerate(csv_files, 1):
     file_response = requests.get(download_url)
     file_response.raise_for_status()
     
-    with open(output_path, 'wb') as f:
-        f.write(file_response.content)
+    write_bytes_atomic(output_path, file_response.content)
     
     print(f"  ✓ Saved to {output_path}")
 
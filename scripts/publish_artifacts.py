@@ -0,0 +1,174 @@
+"""
+Publish the built data files under content-hash names with precompressed siblings.
+
+Each artifact is copied to Data/published/<name>.<hash><ext> with .gz and .br
+(brotli) siblings next to it. Names depend only on
+the content, so an unchanged artifact keeps its name and is not recompressed,
+and browsers or a caching proxy can treat the files as immutable. A server
+that supports precompressed files (e.g. nginx gzip_static/brotli_static) can
+serve the siblings directly.
+
+Data/published/manifest.json maps the keys of index.html's CONFIG.paths to the
+current files. It is the only file that changes in place and should be served
+with revalidation (no-cache). Hashed files referenced by neither the current
+nor the previous manifest are removed.
+
+The election results entry carries its version (see results_delta.py), and the
+latest delta is published as electionResultsDelta with its from_version and
+to_version, so a client holding the previous version can apply the patch
+instead of downloading the full file.
+
+Usage (from the repo root):
+    python scripts/publish_artifacts.py
+    python scripts/publish_artifacts.py --no-brotli   # gzip siblings only
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+from atomic_write import write_bytes_atomic
+from results_delta import delta_path_for, shard_hashes, version_id
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PUBLISH_DIR = Path('Data/published')
+MANIFEST_PATH = PUBLISH_DIR / 'manifest.json'
+
+# CONFIG.paths key in index.html -> built artifact
+ARTIFACTS = {
+    'counties': Path('Data/tl_2020_05_county20.geojson'),
+    'electionResults': Path('Data/arkansas_county_election_results.json'),
+    'districtResults': Path('Data/arkansas_district_election_results.json'),
+    'countyLookup': Path('Data/county_lookup.csv'),
+}
+
+RESULTS_DELTA_PATH = delta_path_for(ARTIFACTS['electionResults'])
+
+HASH_LENGTH = 16
+
+
+def site_path(path):
+    """Path as index.html fetches it (relative to the repo root)"""
+    return f"./{path.as_posix()}"
+
+
+def publish_file(source, with_brotli=True):
+    """Write the hashed copy and its compressed siblings; returns the manifest entry"""
+    data = source.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    target = PUBLISH_DIR / f"{source.stem}.{digest[:HASH_LENGTH]}{source.suffix}"
+
+    if not target.exists():
+        write_bytes_atomic(target, data)
+    entry = {'path': site_path(target), 'sha256': digest, 'bytes': len(data), 'encodings': {}}
+
+    gz_target = target.with_name(target.name + '.gz')
+    if not gz_target.exists():
+        # mtime=0 keeps the .gz bytes identical for identical input
+        write_bytes_atomic(gz_target, gzip.compress(data, compresslevel=9, mtime=0))
+    entry['encodings']['gzip'] = {'path': site_path(gz_target), 'bytes': gz_target.stat().st_size}
+
+    if with_brotli:
+        br_target = target.with_name(target.name + '.br')
+        if not br_target.exists():
+            write_bytes_atomic(br_target, brotli.compress(data, quality=11))
+        entry['encodings']['br'] = {'path': site_path(br_target), 'bytes': br_target.stat().st_size}
+
+    return entry
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def referenced_files(manifest):
+    """File names of every hashed artifact (and sibling) a manifest points to"""
+    names = set()
+    for entry in (manifest or {}).get('artifacts', {}).values():
+        names.add(Path(entry['path']).name)
+        names.update(Path(encoded['path']).name for encoded in entry['encodings'].values())
+    return names
+
+
+def publish_results_delta(results_entry, with_brotli):
+    """Version the election results entry and publish the delta that leads to that version"""
+    with open(ARTIFACTS['electionResults']) as f:
+        results_entry['version'] = version_id(shard_hashes(json.load(f)))
+
+    if not RESULTS_DELTA_PATH.exists():
+        print(f"  [SKIP] electionResultsDelta: {RESULTS_DELTA_PATH} has not been built")
+        return None
+    with open(RESULTS_DELTA_PATH) as f:
+        delta = json.load(f)
+    if delta['to_version'] != results_entry['version']:
+        print(f"  [WARN] {RESULTS_DELTA_PATH} ends at {delta['to_version']}, not the current "
+              f"version {results_entry['version']} - not publishing it")
+        return None
+
+    entry = publish_file(RESULTS_DELTA_PATH, with_brotli)
+    entry['from_version'] = delta['from_version']
+    entry['to_version'] = delta['to_version']
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--no-brotli', action='store_true', help='publish gzip siblings only')
+    args = parser.parse_args()
+
+    with_brotli = not args.no_brotli
+    if with_brotli and brotli is None:
+        raise SystemExit("The brotli package is required for .br siblings (pip install brotli), "
+                         "or pass --no-brotli to publish gzip only")
+
+    PUBLISH_DIR.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest()
+
+    artifacts = {}
+    for key, source in ARTIFACTS.items():
+        if not source.exists():
+            print(f"  [SKIP] {key}: {source} has not been built")
+            continue
+        entry = publish_file(source, with_brotli)
+        artifacts[key] = entry
+        sizes = ', '.join(f"{name} {encoded['bytes']:,}" for name, encoded in entry['encodings'].items())
+        print(f"  {key}: {entry['path']} ({entry['bytes']:,} bytes; {sizes})")
+
+        if key == 'electionResults':
+            delta_entry = publish_results_delta(entry, with_brotli)
+            if delta_entry is not None:
+                artifacts['electionResultsDelta'] = delta_entry
+                print(f"  electionResultsDelta: {delta_entry['from_version']} -> {delta_entry['to_version']} "
+                      f"({delta_entry['path']})")
+
+    manifest = {
+        'paths': {key: entry['path'] for key, entry in artifacts.items()},
+        'artifacts': artifacts
+    }
+    if manifest != previous:
+        write_bytes_atomic(MANIFEST_PATH, json.dumps(manifest, indent=2).encode())
+
+    # Keep the files of the current and previous manifest so pages loaded mid-publish still resolve
+    keep = referenced_files(manifest) | referenced_files(previous) | {MANIFEST_PATH.name}
+    removed = 0
+    for path in PUBLISH_DIR.iterdir():
+        if path.is_file() and path.name not in keep and not path.name.startswith('.'):
+            path.unlink()
+            removed += 1
+
+    print(f"\n[SUCCESS] Published {len(artifacts)} artifacts, manifest at {MANIFEST_PATH}"
+          + (f" ({removed} stale files removed)" if removed else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Delta output between consecutive builds of the election results JSON.
+
+The artifact is split into shards - one per contest under results_by_year and
+under feature_state/contests, plus each remaining top-level section - and each
+shard gets a content hash. The hashes are kept in a small manifest next to the
+artifact, together with a digest of the artifact file so a manifest that no
+longer matches it (after a git pull or checkout) is ignored. On the next build
+the new hashes are compared with the old ones first; only shards whose hash
+changed are loaded from the previous artifact and diffed into JSON Patch
+(RFC 6902) operations, so an unchanged rebuild never re-parses the previous file.
+
+Delta file shape:
+    {
+      "from_version": "...", "to_version": "...",
+      "changed": [...], "added": [...], "removed": [...],   # shard pointers
+      "patch": [{"op": "replace", "path": "/results_by_year/2020/...", "value": ...}, ...]
+    }
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+
+def escape_pointer_token(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def unescape_pointer_token(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def to_pointer(keys):
+    """Tuple of keys -> JSON pointer string"""
+    return ''.join('/' + escape_pointer_token(key) for key in keys)
+
+
+def from_pointer(pointer):
+    """JSON pointer string -> tuple of keys"""
+    return tuple(unescape_pointer_token(token) for token in pointer.split('/')[1:])
+
+
+def content_hash(value):
+    """Stable hash of a JSON value"""
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def iter_shards(document):
+    """Yield (keys, value) for every shard of the artifact"""
+    for section, value in document.items():
+        if section == 'results_by_year':
+            # One shard per contest: year / office category / contest
+            for year, categories in value.items():
+                for category, contests in categories.items():
+                    for contest_key, contest in contests.items():
+                        yield (section, year, category, contest_key), contest
+        elif section == 'feature_state':
+            # One shard per contest array, plus palette, features, ...
+            for name, part in value.items():
+                if name == 'contests':
+                    for contest_id, codes in part.items():
+                        yield (section, name, contest_id), codes
+                else:
+                    yield (section, name), part
+        else:
+            yield (section,), value
+
+
+def shard_hashes(document):
+    """{pointer: content hash} for every shard"""
+    return {to_pointer(keys): content_hash(value) for keys, value in iter_shards(document)}
+
+
+def version_id(hashes):
+    """Identify an artifact version by its shard hashes"""
+    return content_hash(sorted(hashes.items()))
+
+
+def dropped_contests(old_hashes, new_hashes):
+    """(year, category, contest_key) of every results_by_year contest the new build no longer has"""
+    return sorted(
+        from_pointer(pointer)[1:] for pointer in old_hashes
+        if pointer not in new_hashes and from_pointer(pointer)[0] == 'results_by_year'
+    )
+
+
+def diff_values(old, new, keys, ops):
+    """Append JSON Patch operations turning `old` into `new` (dicts are diffed key by key)"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': to_pointer(keys + (key,))})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({'op': 'add', 'path': to_pointer(keys + (key,)), 'value': value})
+            elif old[key] != value:
+                diff_values(old[key], value, keys + (key,), ops)
+    elif old != new:
+        ops.append({'op': 'replace', 'path': to_pointer(keys), 'value': new})
+
+
+def get_path(document, keys):
+    for key in keys:
+        document = document[key]
+    return document
+
+
+def _prefixes(pointers):
+    """Every ancestor path (including the path itself) of the given shard pointers"""
+    prefixes = set()
+    for pointer in pointers:
+        keys = from_pointer(pointer)
+        prefixes.update(keys[:i] for i in range(1, len(keys) + 1))
+    return prefixes
+
+
+def _highest_missing_ancestor(keys, existing):
+    """The shortest prefix of `keys` that is not in `existing`"""
+    for i in range(1, len(keys)):
+        if keys[:i] not in existing:
+            return keys[:i]
+    return keys
+
+
+def build_delta(old_hashes, new_hashes, new_document, load_old_document):
+    """
+    Compare shard hashes and diff only the shards that changed.
+
+    `load_old_document` is called (once) only when at least one shard changed.
+    """
+    changed = sorted(p for p in new_hashes if p in old_hashes and old_hashes[p] != new_hashes[p])
+    added = sorted(p for p in new_hashes if p not in old_hashes)
+    removed = sorted(p for p in old_hashes if p not in new_hashes)
+
+    ops = []
+
+    # Removed shards: remove the highest ancestor that no longer exists in the new document
+    new_prefixes = _prefixes(new_hashes)
+    removed_roots = set()
+    for pointer in removed:
+        root = _highest_missing_ancestor(from_pointer(pointer), new_prefixes)
+        if root not in removed_roots:
+            removed_roots.add(root)
+            ops.append({'op': 'remove', 'path': to_pointer(root)})
+
+    if changed:
+        old_document = load_old_document()
+        for pointer in changed:
+            keys = from_pointer(pointer)
+            diff_values(get_path(old_document, keys), get_path(new_document, keys), keys, ops)
+
+    # Added shards: add the highest ancestor that did not exist in the old document
+    old_prefixes = _prefixes(old_hashes)
+    added_roots = set()
+    for pointer in added:
+        root = _highest_missing_ancestor(from_pointer(pointer), old_prefixes)
+        if root not in added_roots:
+            added_roots.add(root)
+            ops.append({'op': 'add', 'path': to_pointer(root), 'value': get_path(new_document, root)})
+
+    return {
+        'from_version': version_id(old_hashes),
+        'to_version': version_id(new_hashes),
+        'changed': changed,
+        'added': added,
+        'removed': removed,
+        'patch': ops
+    }
+
+
+def apply_patch(document, ops):
+    """Apply JSON Patch add/remove/replace operations in place (for clients and query tooling)"""
+    for op in ops:
+        keys = from_pointer(op['path'])
+        parent = get_path(document, keys[:-1])
+        if op['op'] == 'remove':
+            del parent[keys[-1]]
+        elif op['op'] in ('add', 'replace'):
+            parent[keys[-1]] = op['value']
+        else:
+            raise ValueError(f"Unsupported patch operation: {op['op']}")
+    return document
+
+
+def hashes_path_for(artifact_path):
+    artifact_path = Path(artifact_path)
+    return artifact_path.with_name(f"{artifact_path.stem}.hashes.json")
+
+
+def delta_path_for(artifact_path):
+    artifact_path = Path(artifact_path)
+    return artifact_path.with_name(f"{artifact_path.stem}.delta.json")
+
+
+def artifact_digest(artifact_path):
+    """sha256 of the artifact file's bytes"""
+    return hashlib.sha256(Path(artifact_path).read_bytes()).hexdigest()
+
+
+def load_previous_hashes(artifact_path):
+    """
+    Shard hashes of the artifact currently on disk.
+
+    The manifest is only trusted when its recorded digest matches the artifact;
+    the artifact is committed and can change under it (git pull/checkout), and
+    the delta's changed shards are diffed against the artifact, not the manifest.
+    """
+    if not Path(artifact_path).exists():
+        return None
+    hashes_path = hashes_path_for(artifact_path)
+    if hashes_path.exists():
+        with open(hashes_path) as f:
+            manifest = json.load(f)
+        if manifest.get('artifact_sha256') == artifact_digest(artifact_path):
+            return manifest['shards']
+    with open(artifact_path) as f:
+        return shard_hashes(json.load(f))
@@ -0,0 +1,284 @@
+"""
+Monte Carlo swing simulator over county results.
+
+Loads dem/rep votes for one base contest from
+arkansas_county_election_results.json into NumPy arrays and runs batches of
+scenarios, each a turnout shift plus a swing in two-party margin:
+
+    uniform   one statewide swing per scenario (+ county noise)
+    regional  statewide swing + a swing per region (NW/NE/SW/SE by county
+              interior point) + county noise
+    trend     statewide swing + each county's shift since a reference contest,
+              scaled by a random factor per scenario (+ county noise)
+
+Swings are in points of two-party margin, positive toward Democrats. Results
+are distributions of the statewide margin, the number of counties that flip
+relative to the base contest, and the county count in each category. Counties
+are categorized exactly as competitiveness_code does for the results JSON: an
+exact tie is Tossup, 0 < |margin| < 0.5 is Unknown, and a county with no
+two-party votes is No Data. The same --seed (and --batch-size) gives the same
+results.
+
+Usage (from the repo root):
+    python scripts/swing_simulator.py --contest 2020/presidential/us_president --swing -2 --swing-sd 3
+    python scripts/swing_simulator.py --model trend --trend-from 2012/presidential/president -n 500000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from county_features import county_key, load_county_features
+from create_county_election_json import CATEGORIZATION_SYSTEM, CATEGORY_CODES, CATEGORY_PALETTE, NO_CATEGORY_COLOR
+
+RESULTS_PATH = 'Data/arkansas_county_election_results.json'
+
+# Region boundaries (county interior point): north/south of 35.0N, west/east of 92.3W
+REGION_LAT = 35.0
+REGION_LON = -92.3
+REGIONS = ['NW', 'NE', 'SW', 'SE']
+
+# Extra count columns after the palette codes, for competitiveness_code's UNKNOWN_CODE and NO_DATA_CODE
+UNKNOWN_BUCKET = len(CATEGORY_PALETTE)
+NO_DATA_BUCKET = len(CATEGORY_PALETTE) + 1
+N_BUCKETS = len(CATEGORY_PALETTE) + 2
+
+
+def load_contest_votes(results_by_year, contest_path):
+    """{county key: (dem, rep)} for a contest given as 'year/category/contest_key'"""
+    year, category, contest_key = contest_path.split('/')
+    try:
+        results = results_by_year[year][category][contest_key]['results']
+    except KeyError:
+        raise SystemExit(f"Contest not found: {contest_path}")
+    return {
+        county_key(county): (r['dem_votes'], r['rep_votes'])
+        for county, r in results.items()
+    }
+
+
+def two_party_margin(dem, rep):
+    """Two-party margin in points, positive toward Democrats"""
+    total = dem + rep
+    return np.divide(dem - rep, total, out=np.zeros_like(total, dtype=float), where=total > 0) * 100
+
+
+def category_bins():
+    """
+    Ascending signed-margin bin edges and the count bucket of each bin.
+
+    Matches competitiveness_code: party ranges use `min <= |margin| < max`, an
+    exact tie is Tossup and the gap between the tie and the Tilt ranges
+    (0 < |margin| < 0.5) is Unknown. Republican bins include their (negative)
+    upper edge, so those edges (and the edge above the tie) are nudged up one
+    float32 step for np.searchsorted(edges, margin, side='right').
+    """
+    rep_cats = sorted(CATEGORIZATION_SYSTEM['Republican'], key=lambda cat: -cat['min'])
+    dem_cats = sorted(CATEGORIZATION_SYSTEM['Democratic'], key=lambda cat: cat['min'])
+
+    up = np.float32(np.inf)
+    edges = [np.nextafter(np.float32(-cat['min']), up) for cat in rep_cats]
+    edges += [np.float32(0), np.nextafter(np.float32(0), up)]
+    edges += [np.float32(cat['min']) for cat in dem_cats]
+
+    codes = [CATEGORY_CODES[('Republican', cat['category'])] for cat in rep_cats]
+    codes += [UNKNOWN_BUCKET, CATEGORY_CODES[('Tossup', 'Tossup')], UNKNOWN_BUCKET]
+    codes += [CATEGORY_CODES[('Democratic', cat['category'])] for cat in dem_cats]
+    return np.array(edges, dtype=np.float32), np.array(codes, dtype=np.int16)
+
+
+class SwingSimulator:
+    """County vote arrays for one base contest plus the scenario generator"""
+
+    def __init__(self, counties, dem, rep, regions, trend=None):
+        self.counties = counties
+        self.dem = np.asarray(dem, dtype=float)
+        self.rep = np.asarray(rep, dtype=float)
+        self.two_party = self.dem + self.rep
+        self.no_data = self.two_party == 0
+        self.dem_share = np.divide(self.dem, self.two_party, out=np.full_like(self.dem, 0.5), where=self.two_party > 0)
+        self.base_dem_wins = self.dem > self.rep
+        self.regions = np.asarray(regions)
+        self.trend = None if trend is None else np.asarray(trend, dtype=float)
+        self.bin_edges, self.bin_codes = category_bins()
+
+    @classmethod
+    def from_results(cls, results_path, contest_path, trend_from=None):
+        with open(results_path) as f:
+            results_by_year = json.load(f)['results_by_year']
+        base = load_contest_votes(results_by_year, contest_path)
+        reference = load_contest_votes(results_by_year, trend_from) if trend_from else None
+
+        features = load_county_features()
+        counties, votes, regions, trend = [], [], [], []
+        for name, lat, lon in zip(features['NAME20'], features['INTPTLAT20'], features['INTPTLON20']):
+            key = county_key(name)
+            if key not in base or (reference is not None and key not in reference):
+                continue
+            counties.append(name)
+            votes.append(base[key])
+            regions.append(REGIONS.index(('N' if lat >= REGION_LAT else 'S') + ('W' if lon < REGION_LON else 'E')))
+            if reference is not None:
+                dem, rep = base[key]
+                ref_dem, ref_rep = reference[key]
+                trend.append(two_party_margin(np.float64(dem), np.float64(rep)) - two_party_margin(np.float64(ref_dem), np.float64(ref_rep)))
+
+        dem, rep = np.array(votes, dtype=float).T
+        return cls(counties, dem, rep, regions, trend if reference is not None else None)
+
+    def categorize(self, margin):
+        """Count bucket per county from two-party margin (palette code, UNKNOWN_BUCKET or NO_DATA_BUCKET)"""
+        codes = self.bin_codes[np.searchsorted(self.bin_edges, margin, side='right')]
+        codes[..., self.no_data] = NO_DATA_BUCKET
+        return codes
+
+    def run_batch(self, rng, size, params):
+        """Simulate `size` scenarios; returns (statewide margin, counties flipped, category counts)"""
+        n_counties = len(self.counties)
+
+        def normal(shape):
+            # float32 halves the cost of the (size x counties) draws; vote totals stay well within its precision
+            return rng.standard_normal(shape, dtype=np.float32)
+
+        turnout = 1 + (params.turnout_shift
+                       + params.turnout_sd * normal((size, 1))
+                       + params.county_turnout_sd * normal((size, n_counties))) / 100
+        np.maximum(turnout, 0, out=turnout)
+
+        swing = params.swing + params.swing_sd * normal((size, 1))
+        if params.model == 'regional':
+            swing = swing + params.regional_sd * normal((size, len(REGIONS)))[:, self.regions]
+        elif params.model == 'trend':
+            if self.trend is None:
+                raise ValueError("The trend model needs a reference contest (trend_from)")
+            scale = params.trend_weight + params.trend_sd * normal((size, 1))
+            swing = swing + scale * self.trend.astype(np.float32)
+        swing = swing + params.county_sd * normal((size, n_counties))
+
+        # A swing of s points in margin moves the Democratic two-party share by s/2 points
+        dem_share = np.clip(self.dem_share.astype(np.float32) + swing / 200, 0, 1)
+        margin = (2 * dem_share - 1) * 100
+        two_party = self.two_party.astype(np.float32) * turnout
+        dem = two_party * dem_share
+
+        statewide = (2 * dem.sum(axis=1) / two_party.sum(axis=1) - 1) * 100
+        flipped = ((margin > 0) != self.base_dem_wins).sum(axis=1)
+
+        codes = self.categorize(margin)
+        offsets = np.arange(size)[:, None] * N_BUCKETS
+        counts = np.bincount((codes + offsets).ravel(), minlength=size * N_BUCKETS)
+        return statewide, flipped, counts.reshape(size, N_BUCKETS)
+
+    def run(self, n_scenarios, params, seed=0, batch_size=50_000):
+        """Run all scenarios in batches; each batch gets its own child seed"""
+        n_batches = -(-n_scenarios // batch_size)
+        seeds = np.random.SeedSequence(seed).spawn(n_batches)
+        margins, flips, counts = [], [], []
+        for i, child in enumerate(seeds):
+            size = min(batch_size, n_scenarios - i * batch_size)
+            statewide, flipped, category_counts = self.run_batch(np.random.default_rng(child), size, params)
+            margins.append(statewide)
+            flips.append(flipped)
+            counts.append(category_counts)
+        return np.concatenate(margins), np.concatenate(flips), np.concatenate(counts)
+
+
+def format_margin(margin):
+    """Same R+/D+ style as the results JSON"""
+    if margin > 0:
+        return f"D+{margin:.2f}"
+    if margin < 0:
+        return f"R+{-margin:.2f}"
+    return 'EVEN'
+
+
+def summarize(simulator, margins, flips, counts):
+    percentiles = [5, 25, 50, 75, 95]
+    base_margin = two_party_margin(simulator.dem.sum(), simulator.rep.sum())
+    return {
+        'scenarios': int(len(margins)),
+        'counties': len(simulator.counties),
+        'base_statewide_margin': float(base_margin),
+        'statewide_margin': {
+            'mean': float(margins.mean()),
+            'percentiles': {str(p): float(v) for p, v in zip(percentiles, np.percentile(margins, percentiles))},
+            'p_dem_win': float((margins > 0).mean()),
+        },
+        'counties_flipped': {
+            'mean': float(flips.mean()),
+            'percentiles': {str(p): float(v) for p, v in zip(percentiles, np.percentile(flips, percentiles))},
+            'distribution': {str(k): int(v) for k, v in enumerate(np.bincount(flips)) if v},
+        },
+        'category_counts': [
+            {
+                'category': entry['category'],
+                'party': entry['party'],
+                'color': entry['color'],
+                'mean': float(counts[:, entry['code']].mean()),
+                'p5': float(np.percentile(counts[:, entry['code']], 5)),
+                'p95': float(np.percentile(counts[:, entry['code']], 95)),
+            }
+            for entry in CATEGORY_PALETTE + [
+                {'code': UNKNOWN_BUCKET, 'category': 'Unknown', 'party': None, 'color': NO_CATEGORY_COLOR},
+                {'code': NO_DATA_BUCKET, 'category': 'No Data', 'party': None, 'color': NO_CATEGORY_COLOR},
+            ]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo turnout/swing scenarios over county results')
+    parser.add_argument('--contest', default='2020/presidential/us_president', help='base contest as year/category/contest_key')
+    parser.add_argument('--model', choices=['uniform', 'regional', 'trend'], default='uniform')
+    parser.add_argument('-n', '--scenarios', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    parser.add_argument('--turnout-shift', type=float, default=0.0, help='mean turnout change in percent')
+    parser.add_argument('--turnout-sd', type=float, default=2.0, help='statewide turnout s.d. in percent')
+    parser.add_argument('--county-turnout-sd', type=float, default=2.0, help='per-county turnout s.d. in percent')
+    parser.add_argument('--swing', type=float, default=0.0, help='mean swing in margin points (+ toward D)')
+    parser.add_argument('--swing-sd', type=float, default=3.0, help='statewide swing s.d. in points')
+    parser.add_argument('--regional-sd', type=float, default=2.0, help='regional swing s.d. in points (regional model)')
+    parser.add_argument('--county-sd', type=float, default=1.5, help='per-county swing s.d. in points')
+    parser.add_argument('--trend-from', help='reference contest for the trend model, e.g. 2012/presidential/president')
+    parser.add_argument('--trend-weight', type=float, default=1.0, help='mean share of the county trend repeated (trend model)')
+    parser.add_argument('--trend-sd', type=float, default=0.5, help='s.d. of the trend scale (trend model)')
+    parser.add_argument('--output', help='write the summary as JSON')
+    args = parser.parse_args()
+    if args.model == 'trend' and not args.trend_from:
+        parser.error('--model trend needs --trend-from')
+
+    simulator = SwingSimulator.from_results(RESULTS_PATH, args.contest, args.trend_from)
+    print(f"Loaded {args.contest}: {len(simulator.counties)} counties, model={args.model}")
+
+    start = time.perf_counter()
+    margins, flips, counts = simulator.run(args.scenarios, args, args.seed, args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(simulator, margins, flips, counts)
+    summary['parameters'] = vars(args)
+    summary['benchmark'] = {'seconds': elapsed, 'scenarios_per_second': args.scenarios / elapsed}
+
+    margin = summary['statewide_margin']
+    print(f"\nBase statewide margin: {format_margin(summary['base_statewide_margin'])}")
+    print(f"Simulated statewide margin: mean {format_margin(margin['mean'])}, "
+          f"90% interval {format_margin(margin['percentiles']['5'])} to {format_margin(margin['percentiles']['95'])}, "
+          f"P(D win) {margin['p_dem_win']:.1%}")
+    print(f"Counties flipped: mean {summary['counties_flipped']['mean']:.1f}, "
+          f"90% interval {summary['counties_flipped']['percentiles']['5']:.0f}-{summary['counties_flipped']['percentiles']['95']:.0f}")
+    print("\nCounties per category (mean, 5th-95th percentile):")
+    for entry in summary['category_counts']:
+        label = entry['category'] if entry['party'] in ('Tossup', None) else f"{entry['category']} {entry['party']}"
+        print(f"  {label:<26} {entry['mean']:6.1f}  ({entry['p5']:.0f}-{entry['p95']:.0f})")
+    print(f"\n{args.scenarios:,} scenarios in {elapsed:.2f}s ({summary['benchmark']['scenarios_per_second']:,.0f} scenarios/sec)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Saved summary to {args.output}")
+
+
+if __name__ == '__main__':
+    main()